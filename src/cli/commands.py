@@ -0,0 +1,1283 @@
+"""Command implementations for the egpu CLI.
+
+Kept separate from the argument parser so the Kubernetes client is only
+imported once a command actually runs.
+"""
+
+import io
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import select
+import shutil
+import stat
+import subprocess
+import sys
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional: pip install ephemeral-gpu-image-inference-operator[fast]
+    orjson = None
+
+from kubernetes import client, config, watch
+from kubernetes.client.rest import ApiException
+from kubernetes.stream import stream
+from kubernetes.stream.ws_client import STDIN_CHANNEL, V5_CHANNEL_PROTOCOL
+from urllib3.exceptions import MaxRetryError, ProtocolError, ReadTimeoutError
+
+logger = logging.getLogger("egpu")
+
+# Connection failures after which a watch is re-established rather than fatal
+WATCH_RETRY_ERRORS = (MaxRetryError, ProtocolError, ReadTimeoutError)
+
+# API statuses after which a watch is retried (expired resourceVersion,
+# throttling); 5xx is retried too. Others, e.g. 401 and 403, are fatal.
+WATCH_RETRY_STATUSES = frozenset({410, 429})
+
+# Upper bound on concurrent API requests (and pooled connections) per process
+MAX_PARALLEL_REQUESTS = 16
+
+# Uploads at or above either threshold use a native tar | kubectl exec pipeline
+NATIVE_TAR_MIN_BYTES = 100 * 1024 * 1024
+NATIVE_TAR_MIN_FILES = 10_000
+
+# PAX handles members over 8 GiB and long paths, both of which USTAR rejects
+TAR_FORMAT = tarfile.PAX_FORMAT
+
+# Copy pod image for --sync uploads; must provide rsync and tar
+RSYNC_IMAGE = "instrumentisto/rsync-ssh:latest"
+
+
+def load_kubeconfig():
+    """Load Kubernetes configuration."""
+    try:
+        config.load_incluster_config()
+        return True
+    except:
+        try:
+            config.load_kube_config()
+            return True
+        except Exception as e:
+            print(f"Error loading Kubernetes config: {e}", file=sys.stderr)
+            return False
+
+
+@lru_cache(maxsize=1)
+def _get_apis():
+    """Return (CoreV1Api, CustomObjectsApi) sharing a single ApiClient.
+
+    Kubeconfig is parsed and the ApiClient (with its connection pool) is built
+    once per process; exits if no Kubernetes configuration can be loaded.
+    """
+    if not load_kubeconfig():
+        sys.exit(1)
+
+    configuration = client.Configuration.get_default_copy()
+    configuration.connection_pool_maxsize = MAX_PARALLEL_REQUESTS
+    api_client = client.ApiClient(configuration=configuration)
+    return client.CoreV1Api(api_client=api_client), client.CustomObjectsApi(api_client=api_client)
+
+
+def create_pvc(v1, name, namespace, storage_class="longhorn", size="1Gi"):
+    """Create a PVC if it doesn't exist."""
+    try:
+        v1.read_namespaced_persistent_volume_claim(name=name, namespace=namespace)
+        print(f"PVC '{name}' already exists")
+        return True
+    except ApiException as e:
+        if e.status == 404:
+            print(f"Creating PVC '{name}'...")
+            pvc = client.V1PersistentVolumeClaim(
+                metadata=client.V1ObjectMeta(name=name, namespace=namespace),
+                spec=client.V1PersistentVolumeClaimSpec(
+                    access_modes=["ReadWriteOnce"],
+                    storage_class_name=storage_class,
+                    resources=client.V1VolumeResourceRequirements(
+                        requests={"storage": size}
+                    ),
+                ),
+            )
+            try:
+                v1.create_namespaced_persistent_volume_claim(
+                    namespace=namespace, body=pvc
+                )
+                print(f"✓ PVC '{name}' created")
+                return True
+            except Exception as create_error:
+                print(f"✗ Failed to create PVC: {create_error}", file=sys.stderr)
+                return False
+        else:
+            print(f"✗ Error checking PVC: {e}", file=sys.stderr)
+            return False
+
+
+class BackoffSleeper:
+    """Sleep for exponentially growing intervals, capped at ``cap`` seconds."""
+
+    def __init__(self, initial=0.25, factor=1.5, cap=8.0):
+        self.initial = initial
+        self.factor = factor
+        self.cap = cap
+        self.reset()
+
+    def reset(self):
+        """Start again from the initial delay."""
+        self._delay = self.initial
+
+    def __call__(self):
+        time.sleep(self._delay)
+        self._delay = min(self._delay * self.factor, self.cap)
+
+
+def wait_for_phase(v1, kind, name, namespace, target_phases, timeout=60):
+    """Wait for a pod or PVC to reach one of the target phases.
+
+    Watches the single object instead of polling it. If the watch fails or is
+    closed early it is re-established with backoff until the timeout. Returns
+    the object once its phase is in ``target_phases``, or None on timeout.
+    """
+    list_funcs = {
+        "pod": v1.list_namespaced_pod,
+        "pvc": v1.list_namespaced_persistent_volume_claim,
+    }
+    deadline = time.monotonic() + timeout
+    backoff = BackoffSleeper()
+
+    while (remaining := deadline - time.monotonic()) > 0:
+        w = watch.Watch()
+        try:
+            for event in w.stream(
+                list_funcs[kind],
+                namespace=namespace,
+                field_selector=f"metadata.name={name}",
+                timeout_seconds=max(1, int(remaining)),
+            ):
+                obj = event["object"]
+                if obj.status and obj.status.phase in target_phases:
+                    return obj
+                # Still progressing, so retry quickly if the watch drops
+                backoff.reset()
+        except ApiException:
+            pass
+        finally:
+            w.stop()
+
+        if deadline - time.monotonic() > 0:
+            backoff()
+    return None
+
+
+def walk_scandir(root, prefix=""):
+    """Yield (full_path, rel_path, stat_result) for every entry below root.
+
+    Uses os.scandir so each entry is stat'ed once and the result can be reused
+    for its tar header. Directories are yielded before their contents.
+    """
+    with os.scandir(root) as it:
+        for entry in it:
+            rel_path = f"{prefix}{entry.name}"
+            yield entry.path, rel_path, entry.stat(follow_symlinks=False)
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_scandir(entry.path, f"{rel_path}/")
+
+
+def _tarinfo_from_stat(path, arcname, st):
+    """Build a TarInfo from an existing stat result, or None for special files."""
+    ti = tarfile.TarInfo(name=arcname)
+    ti.mtime = int(st.st_mtime)
+    ti.mode = stat.S_IMODE(st.st_mode)
+    if stat.S_ISREG(st.st_mode):
+        ti.size = st.st_size
+    elif stat.S_ISDIR(st.st_mode):
+        ti.type = tarfile.DIRTYPE
+    elif stat.S_ISLNK(st.st_mode):
+        ti.type = tarfile.SYMTYPE
+        ti.linkname = os.readlink(path)
+    else:
+        return None
+    return ti
+
+
+def add_to_tar(tar, source):
+    """Add a file or directory tree to an open tarfile under its own name."""
+    entries = [(str(source), source.name, source.stat())]
+    if source.is_dir():
+        entries = itertools.chain(entries, walk_scandir(source, f"{source.name}/"))
+
+    for path, arcname, st in entries:
+        ti = _tarinfo_from_stat(path, arcname, st)
+        if ti is None:
+            continue
+        if ti.isreg():
+            with open(path, "rb", buffering=1 << 20) as f:
+                tar.addfile(ti, f)
+        else:
+            tar.addfile(ti)
+
+
+class _ExecStdin(io.RawIOBase):
+    """Write-only raw stream that forwards data to an exec session's stdin."""
+
+    def __init__(self, resp):
+        self._resp = resp
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._resp.write_stdin(bytes(data))
+        return len(data)
+
+
+def _is_large_tree(source):
+    """Return True if source exceeds the native-tar size or file-count threshold."""
+    if not source.is_dir():
+        return source.stat().st_size >= NATIVE_TAR_MIN_BYTES
+
+    total_bytes = 0
+    file_count = 0
+    for _, _, st in walk_scandir(source):
+        total_bytes += st.st_size
+        file_count += 1
+        if total_bytes >= NATIVE_TAR_MIN_BYTES or file_count >= NATIVE_TAR_MIN_FILES:
+            return True
+    return False
+
+
+def _can_close_stdin(resp):
+    """Return True if the exec connection can signal EOF on stdin.
+
+    close_channel() only works over the v5.channel.k8s.io subprotocol
+    (Kubernetes 1.29+); on older servers it silently does nothing.
+    """
+    return resp.subprotocol == V5_CHANNEL_PROTOCOL
+
+
+def _stream_tarfile(v1, source, pod_name, namespace, target_path):
+    """Stream a gzipped tarfile archive of source into tar running in the pod.
+
+    Needs the v5 exec protocol so tar sees EOF; without it the upload goes
+    through native tar and kubectl when available, and fails otherwise.
+    """
+    resp = stream(
+        v1.connect_get_namespaced_pod_exec,
+        pod_name,
+        namespace,
+        command=["tar", "xzf", "-", "-C", target_path],
+        stdin=True,
+        stdout=True,
+        stderr=True,
+        tty=False,
+        _preload_content=False,
+    )
+    if not _can_close_stdin(resp):
+        resp.close()
+        if shutil.which("tar") and shutil.which("kubectl"):
+            print("⚠ API server does not support closing exec stdin, uploading with kubectl")
+            return _pipe_native_tar(source, pod_name, namespace, target_path)
+        print(
+            "✗ API server does not support closing exec stdin (needs Kubernetes 1.29+); "
+            "install tar and kubectl to upload through kubectl instead",
+            file=sys.stderr,
+        )
+        return False
+
+    try:
+        # Coalesce tarfile's small writes into 1 MiB websocket frames
+        stdin = io.BufferedWriter(_ExecStdin(resp), buffer_size=1 << 20)
+        # Level 1 gzip: most of the size reduction at a fraction of the CPU cost.
+        # copybufsize moves file payloads in 1 MiB chunks instead of 16 KiB.
+        with tarfile.open(
+            fileobj=stdin,
+            mode="w|gz",
+            bufsize=1 << 20,
+            compresslevel=1,
+            copybufsize=1 << 20,
+            format=TAR_FORMAT,
+        ) as tar:
+            add_to_tar(tar, source)
+        stdin.flush()
+        # gunzip only finishes once stdin reaches EOF
+        resp.close_channel(STDIN_CHANNEL)
+
+        # Wait for tar to exit and surface any error it reported
+        resp.run_forever(timeout=60)
+        if resp.returncode != 0:
+            print(f"✗ Failed to extract files: {resp.read_stderr()}", file=sys.stderr)
+            return False
+        return True
+    finally:
+        resp.close()
+
+
+def _pipe_native_tar(source, pod_name, namespace, target_path):
+    """Pipe a local `tar` straight into `kubectl exec ... tar` in the pod."""
+    tar_proc = subprocess.Popen(
+        ["tar", "-C", str(source.parent), "-czf", "-", source.name],
+        stdout=subprocess.PIPE,
+        bufsize=1 << 20,
+        close_fds=True,
+    )
+    exec_proc = subprocess.Popen(
+        [
+            "kubectl", "exec", "-i", "-n", namespace, pod_name, "--",
+            "tar", "xzf", "-", "-C", target_path,
+        ],
+        stdin=tar_proc.stdout,
+        stderr=subprocess.PIPE,
+        bufsize=1 << 20,
+        close_fds=True,
+    )
+    # Drop our copy of the pipe so tar sees SIGPIPE if kubectl exits early
+    tar_proc.stdout.close()
+    _, stderr = exec_proc.communicate()
+    tar_proc.wait()
+
+    if tar_proc.returncode != 0 or exec_proc.returncode != 0:
+        print(f"✗ Failed to copy files: {stderr.decode(errors='replace')}", file=sys.stderr)
+        return False
+    return True
+
+
+def _rsync_to_pod(source, pod_name, namespace, target_path):
+    """Sync source into target_path in the pod using rsync over kubectl exec."""
+    # rsync runs "<rsh> <host> <rsync-path> --server ..."; with an empty
+    # rsync-path the "host" becomes the remote command, so use host "rsync".
+    result = subprocess.run(
+        [
+            "rsync", "-az", "--delete", "--blocking-io", "--rsync-path=",
+            f"--rsh=kubectl exec -i -n {namespace} {pod_name} --",
+            str(source), f"rsync:{target_path}/",
+        ],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(f"✗ Failed to sync files: {result.stderr}", file=sys.stderr)
+        return False
+    return True
+
+
+def copy_to_pvc(v1, pvc_name, namespace, source_path, target_path="/artifacts", sync=False):
+    """Copy files/directories from local filesystem into PVC.
+
+    The archive is streamed straight into ``tar`` running inside a copy pod,
+    so nothing is staged on local disk. Large trees go through native tar and
+    kubectl when both are installed; otherwise the Python tarfile path is used.
+    With ``sync``, rsync over kubectl exec sends only files that changed since
+    the last upload.
+    """
+    source = Path(source_path)
+    if not source.exists():
+        print(f"✗ Source path does not exist: {source_path}", file=sys.stderr)
+        return False
+
+    print(f"Copying '{source_path}' to PVC '{pvc_name}' at '{target_path}'...")
+
+    # Create a pod to extract the archive into PVC
+    pod_name = f"copy-to-pvc-{pvc_name}"
+
+    try:
+        # Delete any existing copy pod
+        try:
+            v1.delete_namespaced_pod(name=pod_name, namespace=namespace, grace_period_seconds=0)
+        except ApiException:
+            pass
+
+        # Create copy pod
+        copy_pod = client.V1Pod(
+            metadata=client.V1ObjectMeta(name=pod_name, namespace=namespace),
+            spec=client.V1PodSpec(
+                restart_policy="Never",
+                containers=[
+                    client.V1Container(
+                        name="copy",
+                        image=RSYNC_IMAGE if sync else "busybox:latest",
+                        image_pull_policy="IfNotPresent",
+                        command=["sh", "-c", "sleep 3600"],
+                        volume_mounts=[
+                            client.V1VolumeMount(
+                                name="artifacts", mount_path=target_path
+                            )
+                        ],
+                    )
+                ],
+                volumes=[
+                    client.V1Volume(
+                        name="artifacts",
+                        persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                            claim_name=pvc_name
+                        ),
+                    )
+                ],
+            ),
+        )
+
+        v1.create_namespaced_pod(namespace=namespace, body=copy_pod)
+
+        # Wait for pod to be ready (includes the PVC binding/provisioning time)
+        if not wait_for_phase(v1, "pod", pod_name, namespace, ("Running",), timeout=60):
+            print("✗ Copy pod did not become ready", file=sys.stderr)
+            return False
+
+        has_kubectl = shutil.which("kubectl") is not None
+        if sync and not (has_kubectl and shutil.which("rsync")):
+            print("⚠ rsync and kubectl are required for --sync, uploading full archive")
+            sync = False
+
+        if sync:
+            copied = _rsync_to_pod(source, pod_name, namespace, target_path)
+        # Native tar is much faster than tarfile on big trees; use it when available
+        elif _is_large_tree(source) and shutil.which("tar") and has_kubectl:
+            copied = _pipe_native_tar(source, pod_name, namespace, target_path)
+        else:
+            copied = _stream_tarfile(v1, source, pod_name, namespace, target_path)
+        if not copied:
+            return False
+
+        print(f"✓ Files copied to PVC")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error copying to PVC: {e}", file=sys.stderr)
+        return False
+    finally:
+        # Clean up pod
+        try:
+            v1.delete_namespaced_pod(name=pod_name, namespace=namespace, grace_period_seconds=0)
+        except ApiException:
+            pass
+
+
+def create_gpujob(
+    custom_api,
+    name,
+    namespace,
+    model="resnet50",
+    input_path="/artifacts/input.jpg",
+    output_path="/artifacts/output.json",
+    gpu=1,
+    ttl=0,
+    pvc_ttl=3600,
+    storage_class="longhorn",
+    pvc_size="1Gi",
+    image="gpu-job-inference:latest",
+    command=None,
+    pvc_name=None,
+):
+    """Create an EphemeralAccelerationJob resource."""
+    if pvc_name is None:
+        pvc_name = f"artifacts-{name}"
+
+    spec = {
+        "model": model,
+        "input": {"type": "image", "path": input_path},
+        "output": {"path": output_path},
+        "resources": {"gpu": gpu},
+        "ttlSecondsAfterFinished": ttl,
+        "pvcTTLSecondsAfterFinished": pvc_ttl,
+        "storageClass": storage_class,
+        "pvcSize": pvc_size,
+        "image": image,
+    }
+
+    if command:
+        spec["command"] = command if isinstance(command, list) else command.split()
+
+    body = {
+        "apiVersion": "gpu.yourdomain.io/v1alpha1",
+        "kind": "EphemeralAccelerationJob",
+        "metadata": {"name": name, "namespace": namespace},
+        "spec": spec,
+    }
+
+    try:
+        custom_api.create_namespaced_custom_object(
+            group="gpu.yourdomain.io",
+            version="v1alpha1",
+            namespace=namespace,
+            plural="ephemeralaccelerationjobs",
+            body=body,
+        )
+        print(f"✓ EphemeralAccelerationJob '{name}' created")
+        return True
+    except ApiException as e:
+        if e.status == 409:
+            print(f"✗ EphemeralAccelerationJob '{name}' already exists", file=sys.stderr)
+        else:
+            print(f"✗ Failed to create EphemeralAccelerationJob: {e}", file=sys.stderr)
+            if e.body:
+                try:
+                    error_body = orjson.loads(e.body) if orjson else json.loads(e.body)
+                    if "message" in error_body:
+                        print(f"  {error_body['message']}", file=sys.stderr)
+                except:
+                    pass
+        return False
+
+
+def cmd_create(args):
+    """Create an EphemeralAccelerationJob with optional project directory upload."""
+    v1, custom_api = _get_apis()
+
+    pvc_name = args.pvc_name or f"artifacts-{args.name}"
+
+    # Create PVC if needed
+    if args.project_dir or args.create_pvc:
+        if not create_pvc(v1, pvc_name, args.namespace, args.storage_class, args.pvc_size):
+            sys.exit(1)
+        # No need to wait for Bound: pods using the claim are only scheduled
+        # once it is bound, so the copy pod's own wait covers it.
+
+    # Copy project directory if specified
+    if args.project_dir:
+        if not copy_to_pvc(v1, pvc_name, args.namespace, args.project_dir, sync=args.sync):
+            sys.exit(1)
+
+    # Create EphemeralAccelerationJob
+    command = args.command.split() if args.command else None
+    pvc_ttl = getattr(args, "pvc_ttl", 3600)  # Default 1 hour if not specified
+    if not create_gpujob(
+        custom_api,
+        args.name,
+        args.namespace,
+        model=args.model,
+        input_path=args.input_path,
+        output_path=args.output_path,
+        gpu=args.gpu,
+        ttl=args.ttl,
+        pvc_ttl=pvc_ttl,
+        storage_class=args.storage_class,
+        pvc_size=args.pvc_size,
+        image=args.image,
+        command=command,
+        pvc_name=pvc_name,
+    ):
+        sys.exit(1)
+
+    print(f"\nEphemeralAccelerationJob '{args.name}' is being processed.")
+    print(f"Watch status: kubectl get ephemeralaccelerationjob {args.name} -n {args.namespace} -w")
+    print(f"Check logs: kubectl logs -l app=gpu-job -n {args.namespace}")
+
+
+def cmd_get(args):
+    """Get EphemeralAccelerationJob status."""
+    _, custom_api = _get_apis()
+
+    try:
+        job = custom_api.get_namespaced_custom_object(
+            group="gpu.yourdomain.io",
+            version="v1alpha1",
+            namespace=args.namespace,
+            plural="ephemeralaccelerationjobs",
+            name=args.name,
+        )
+
+        if args.output == "json":
+            if orjson is not None:
+                sys.stdout.buffer.write(
+                    orjson.dumps(job, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+                )
+            else:
+                print(json.dumps(job, indent=2))
+        else:
+            spec = job.get("spec", {})
+            status = job.get("status", {})
+
+            print(f"EphemeralAccelerationJob: {args.name}")
+            print(f"Namespace: {args.namespace}")
+            print(f"\nSpec:")
+            print(f"  Model: {spec.get('model', 'N/A')}")
+            print(f"  Input: {spec.get('input', {}).get('path', 'N/A')}")
+            print(f"  Output: {spec.get('output', {}).get('path', 'N/A')}")
+            print(f"  GPU: {spec.get('resources', {}).get('gpu', 'N/A')}")
+            print(f"  Image: {spec.get('image', 'N/A')}")
+
+            print(f"\nStatus:")
+            print(f"  Phase: {status.get('phase', 'Unknown')}")
+            print(f"  Message: {status.get('message', 'N/A')}")
+            if status.get("startedAt"):
+                print(f"  Started: {status.get('startedAt')}")
+            if status.get("finishedAt"):
+                print(f"  Finished: {status.get('finishedAt')}")
+            if status.get("artifactPath"):
+                print(f"  Artifact: {status.get('artifactPath')}")
+            if status.get("podName"):
+                print(f"  Pod: {status.get('podName')}")
+
+    except ApiException as e:
+        if e.status == 404:
+            print(f"✗ EphemeralAccelerationJob '{args.name}' not found", file=sys.stderr)
+        else:
+            print(f"✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def list_jobs(custom_api, namespace=None, page_size=500, consistent=False):
+    """List EphemeralAccelerationJobs in a namespace, or cluster-wide if None.
+
+    By default the first page is served from the apiserver watch cache
+    (resourceVersion=0), which is cheap but may be slightly stale; that is
+    fine for display. Pass ``consistent=True`` when the result decides what
+    to delete, to get an up-to-date read instead. Further pages follow the
+    continue token.
+    """
+    kwargs = {
+        "group": "gpu.yourdomain.io",
+        "version": "v1alpha1",
+        "plural": "ephemeralaccelerationjobs",
+        "limit": page_size,
+    }
+    if not consistent:
+        kwargs["resource_version"] = "0"
+    if namespace:
+        list_func = custom_api.list_namespaced_custom_object
+        kwargs["namespace"] = namespace
+    else:
+        list_func = custom_api.list_cluster_custom_object
+
+    items = []
+    while True:
+        response = list_func(**kwargs)
+        items.extend(response.get("items", []))
+        token = response.get("metadata", {}).get("continue")
+        if not token:
+            return items
+        # resourceVersion may not be combined with a continue token
+        kwargs.pop("resource_version", None)
+        kwargs["_continue"] = token
+
+
+def cmd_list(args):
+    """List EphemeralAccelerationJobs."""
+    _, custom_api = _get_apis()
+
+    try:
+        items = list_jobs(custom_api, args.namespace)
+        if not items:
+            print("No EphemeralAccelerationJobs found.")
+            return
+
+        print(f"{'NAME':<30} {'NAMESPACE':<20} {'PHASE':<15} {'GPU':<5} {'MODEL':<20}")
+        print("-" * 90)
+
+        for item in items:
+            metadata = item.get("metadata", {})
+            spec = item.get("spec", {})
+            status = item.get("status", {})
+
+            name = metadata.get("name", "N/A")
+            namespace = metadata.get("namespace", "N/A")
+            phase = status.get("phase", "Unknown")
+            gpu = spec.get("resources", {}).get("gpu", "N/A")
+            model = spec.get("model", "N/A")
+
+            print(f"{name:<30} {namespace:<20} {phase:<15} {gpu:<5} {model:<20}")
+
+    except ApiException as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def delete_pvc(v1, pvc_name, namespace):
+    """Delete a PVC using Kubernetes client."""
+    try:
+        v1.delete_namespaced_persistent_volume_claim(
+            name=pvc_name, namespace=namespace
+        )
+        print(f"✓ PVC '{pvc_name}' deleted")
+        return True
+    except ApiException as e:
+        if e.status == 404:
+            print(f"⚠ PVC '{pvc_name}' not found (may already be deleted)")
+            return False
+        else:
+            print(f"✗ Error deleting PVC: {e}", file=sys.stderr)
+            return False
+
+
+def _to_epoch(timestamp):
+    """Convert an ISO-8601 status timestamp to POSIX seconds (naive means UTC).
+
+    Deliberately a copy of operator.reconcile._to_epoch (the CLI and operator
+    ship separately and share no modules); keep the two in step.
+    """
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _pvc_ttl_passed(job, force):
+    """Return True if the job finished longer than its TTL ago.
+
+    ``force`` is returned instead when finishedAt cannot be parsed.
+    """
+    spec = job.get("spec", {})
+    status = job.get("status", {})
+    finished_at = status.get("finishedAt")
+    ttl = spec.get("ttlSecondsAfterFinished", 0)
+
+    if finished_at and ttl > 0:
+        try:
+            elapsed = time.time() - _to_epoch(finished_at)
+            if elapsed >= ttl:
+                print(f"ℹ TTL ({ttl}s) has passed since job finished, PVC will be deleted")
+                return True
+        except Exception as e:
+            if force:
+                print(f"⚠ Could not parse finishedAt time, will delete PVC anyway: {e}")
+            return force
+    return False
+
+
+def cmd_delete(args):
+    """Delete an EphemeralAccelerationJob."""
+    v1, custom_api = _get_apis()
+
+    try:
+        # Get job first to check TTL and status
+        try:
+            job = custom_api.get_namespaced_custom_object(
+                group="gpu.yourdomain.io",
+                version="v1alpha1",
+                namespace=args.namespace,
+                plural="ephemeralaccelerationjobs",
+                name=args.name,
+            )
+            should_delete_pvc = _pvc_ttl_passed(job, args.delete_pvc)
+        except ApiException:
+            pass  # Job might not exist, continue with deletion
+        
+        # Delete the job
+        custom_api.delete_namespaced_custom_object(
+            group="gpu.yourdomain.io",
+            version="v1alpha1",
+            namespace=args.namespace,
+            plural="ephemeralaccelerationjobs",
+            name=args.name,
+        )
+        print(f"✓ EphemeralAccelerationJob '{args.name}' deleted")
+
+        # Delete PVC if requested or if TTL has passed
+        if args.delete_pvc or should_delete_pvc:
+            pvc_name = args.pvc_name or f"artifacts-{args.name}"
+            delete_pvc(v1, pvc_name, args.namespace)
+
+    except ApiException as e:
+        if e.status == 404:
+            print(f"✗ EphemeralAccelerationJob '{args.name}' not found", file=sys.stderr)
+        else:
+            print(f"✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _delete_job(v1, custom_api, name, namespace, with_pvc):
+    """Delete one job (and optionally its PVC); return True on success."""
+    try:
+        custom_api.delete_namespaced_custom_object(
+            group="gpu.yourdomain.io",
+            version="v1alpha1",
+            namespace=namespace,
+            plural="ephemeralaccelerationjobs",
+            name=name,
+        )
+        print(f"✓ EphemeralAccelerationJob '{name}' deleted")
+    except ApiException as e:
+        print(f"✗ Error deleting '{name}': {e}", file=sys.stderr)
+        return False
+
+    if with_pvc:
+        delete_pvc(v1, f"artifacts-{name}", namespace)
+    return True
+
+
+def cmd_delete_batch(args):
+    """Delete several EphemeralAccelerationJobs using one list call and parallel deletes."""
+    v1, custom_api = _get_apis()
+
+    try:
+        jobs = {
+            item["metadata"]["name"]: item
+            for item in list_jobs(custom_api, args.namespace, consistent=True)
+        }
+    except ApiException as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    failed = False
+    targets = []
+    for name in args.names:
+        job = jobs.get(name)
+        if job is None:
+            print(f"✗ EphemeralAccelerationJob '{name}' not found", file=sys.stderr)
+            failed = True
+            continue
+        targets.append((name, args.delete_pvc or _pvc_ttl_passed(job, args.delete_pvc)))
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+        results = executor.map(
+            lambda target: _delete_job(v1, custom_api, target[0], args.namespace, target[1]),
+            targets,
+        )
+        failed = not all(results) or failed
+
+    if failed:
+        sys.exit(1)
+
+
+def _print_watch_status(job):
+    """Print a job's phase line for `watch`; return True once it has finished."""
+    status = job.get("status", {})
+    phase = status.get("phase", "Unknown")
+    message = status.get("message", "")
+
+    print(f"\r[{phase}] {message}", end="", flush=True)
+
+    if phase in ["Succeeded", "Failed"]:
+        print()
+        return True
+    return False
+
+
+def _get_job(custom_api, name, namespace):
+    """Read one EphemeralAccelerationJob."""
+    return custom_api.get_namespaced_custom_object(
+        group="gpu.yourdomain.io",
+        version="v1alpha1",
+        namespace=namespace,
+        plural="ephemeralaccelerationjobs",
+        name=name,
+    )
+
+
+def _is_retryable(e):
+    """Whether an ApiException seen while watching a job is transient."""
+    return e.status in WATCH_RETRY_STATUSES or (e.status or 0) >= 500
+
+
+def cmd_watch(args):
+    """Watch EphemeralAccelerationJob status.
+
+    Reads the job, then streams changes from its resourceVersion. When the
+    watch fails transiently (expired resourceVersion, throttling, server
+    errors, dropped connections) or the server closes it, the job is read
+    again and the watch restarted, with backoff between failed attempts.
+    Other API errors, such as 401 or 403, exit. Returns once the job has
+    finished.
+    """
+    _, custom_api = _get_apis()
+
+    print(f"Watching EphemeralAccelerationJob '{args.name}' (Ctrl+C to stop)...")
+    print()
+
+    backoff = BackoffSleeper()
+    try:
+        while True:
+            try:
+                job = _get_job(custom_api, args.name, args.namespace)
+            except ApiException as e:
+                if e.status == 404:
+                    print(f"\n✗ EphemeralAccelerationJob '{args.name}' not found", file=sys.stderr)
+                    sys.exit(1)
+                if not _is_retryable(e):
+                    print(f"\n✗ Error reading job: {e.status} {e.reason}", file=sys.stderr)
+                    sys.exit(1)
+                print(f"\n⚠ Error reading job, retrying: {e.status} {e.reason}", file=sys.stderr)
+                backoff()
+                continue
+            except WATCH_RETRY_ERRORS as e:
+                print(f"\n⚠ Connection error, retrying: {e}", file=sys.stderr)
+                backoff()
+                continue
+
+            if _print_watch_status(job):
+                return
+
+            # Stream status changes from the server instead of re-reading the job
+            w = watch.Watch()
+            try:
+                for event in w.stream(
+                    custom_api.list_namespaced_custom_object,
+                    group="gpu.yourdomain.io",
+                    version="v1alpha1",
+                    namespace=args.namespace,
+                    plural="ephemeralaccelerationjobs",
+                    field_selector=f"metadata.name={args.name}",
+                    resource_version=job["metadata"]["resourceVersion"],
+                ):
+                    if event["type"] == "DELETED":
+                        print(f"\n✗ EphemeralAccelerationJob '{args.name}' was deleted", file=sys.stderr)
+                        sys.exit(1)
+                    if _print_watch_status(event["object"]):
+                        return
+                    backoff.reset()
+                # Server closed the watch normally; re-read and resume
+                continue
+            except ApiException as e:
+                if not _is_retryable(e):
+                    print(f"\n✗ Watch error: {e.status} {e.reason}", file=sys.stderr)
+                    sys.exit(1)
+                # 410 Gone means the resourceVersion expired; re-reading fixes it
+                if e.status != 410:
+                    print(f"\n⚠ Watch error, retrying: {e.status} {e.reason}", file=sys.stderr)
+            except WATCH_RETRY_ERRORS as e:
+                print(f"\n⚠ Watch connection lost, retrying: {e}", file=sys.stderr)
+            finally:
+                w.stop()
+            backoff()
+
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+def _cleanup_log_handler(verbose):
+    """Attach a buffered stdout handler to the cleanup logger and return it.
+
+    Records are held in memory and written in batches, so per-job lines in
+    large clusters do not each cost a write and flush.
+    """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    handler = logging.handlers.MemoryHandler(
+        capacity=1000, flushLevel=logging.CRITICAL, target=stream_handler
+    )
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    logger.propagate = False
+    return handler
+
+
+def cmd_cleanup(args):
+    """Clean up PVCs for finished jobs based on TTL."""
+    v1, custom_api = _get_apis()
+    log_handler = _cleanup_log_handler(args.verbose)
+
+    try:
+        # Get all jobs
+        items = list_jobs(custom_api, args.namespace, consistent=True)
+        if not items:
+            logger.info("No EphemeralAccelerationJobs found.")
+            return
+
+        now = time.time()
+        expired = []
+        skipped_count = 0
+
+        logger.info("Checking %d job(s) for PVC cleanup...\n", len(items))
+
+        for item in items:
+            metadata = item.get("metadata", {})
+            spec = item.get("spec", {})
+            status = item.get("status", {})
+
+            name = metadata.get("name")
+            namespace = metadata.get("namespace", "default")
+            phase = status.get("phase")
+            finished_at = status.get("finishedAt")
+            ttl = spec.get("ttlSecondsAfterFinished", 0)
+
+            # Only process finished jobs
+            if phase not in ["Succeeded", "Failed"]:
+                logger.debug("⏭ %s: Job not finished (phase: %s)", name, phase)
+                skipped_count += 1
+                continue
+
+            # If TTL is 0, skip (no automatic cleanup)
+            if ttl == 0:
+                logger.debug("⏭ %s: TTL is 0 (no automatic cleanup)", name)
+                skipped_count += 1
+                continue
+
+            # Check if TTL has passed
+            if not finished_at:
+                logger.debug("⏭ %s: No finishedAt timestamp", name)
+                skipped_count += 1
+                continue
+
+            try:
+                elapsed = now - _to_epoch(finished_at)
+
+                if elapsed >= ttl:
+                    pvc_name = f"artifacts-{name}"
+                    logger.info(
+                        "🗑 %s: TTL expired (%.0fs >= %ss), deleting PVC '%s'...",
+                        name, elapsed, ttl, pvc_name,
+                    )
+                    expired.append((pvc_name, namespace))
+                else:
+                    logger.debug("⏳ %s: TTL not yet met (%.0fs remaining)", name, ttl - elapsed)
+                    skipped_count += 1
+
+            except Exception as e:
+                print(f"✗ {name}: Error processing: {e}", file=sys.stderr)
+                skipped_count += 1
+
+        # Write out the per-job lines before delete_pvc starts printing results
+        log_handler.flush()
+
+        # Deletes are independent round-trips, so issue them concurrently
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+            results = executor.map(lambda target: delete_pvc(v1, *target), expired)
+            deleted_count = sum(results)
+
+        logger.info("\nSummary: %d PVC(s) deleted, %d skipped", deleted_count, skipped_count)
+
+    except ApiException as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        log_handler.flush()
+        logger.removeHandler(log_handler)
+
+
+def cmd_copy_file(args):
+    """Copy a file from URL into PVC using a temporary pod."""
+    v1, _ = _get_apis()
+    
+    pvc_name = args.pvc_name or f"artifacts-{args.job_name}"
+    pod_name = f"copy-file-{args.job_name}-{int(time.time())}"
+    
+    # Verify PVC exists
+    try:
+        pvc = v1.read_namespaced_persistent_volume_claim(
+            name=pvc_name, namespace=args.namespace
+        )
+        if pvc.status.phase != "Bound":
+            print(f"⚠ PVC '{pvc_name}' exists but is not bound yet", file=sys.stderr)
+    except ApiException as e:
+        if e.status == 404:
+            print(f"✗ PVC '{pvc_name}' not found. Create it first or specify --pvc-name", file=sys.stderr)
+            sys.exit(1)
+        else:
+            print(f"✗ Error checking PVC: {e}", file=sys.stderr)
+            sys.exit(1)
+    
+    # Determine target path
+    target_path = args.target_path
+    if not target_path.startswith("/"):
+        target_path = f"/artifacts/{target_path}"
+    
+    print(f"Downloading '{args.url}' to PVC '{pvc_name}' at '{target_path}'...")
+    
+    # Create pod with PVC mount
+    copy_pod = client.V1Pod(
+        metadata=client.V1ObjectMeta(name=pod_name, namespace=args.namespace),
+        spec=client.V1PodSpec(
+            restart_policy="Never",
+            containers=[
+                client.V1Container(
+                    name="copy",
+                    image="busybox:latest",
+                    image_pull_policy="IfNotPresent",
+                    command=["sh", "-c", f"wget -O {target_path} {args.url} && ls -lh {target_path}"],
+                    volume_mounts=[
+                        client.V1VolumeMount(
+                            name="artifacts", mount_path="/artifacts"
+                        )
+                    ],
+                )
+            ],
+            volumes=[
+                client.V1Volume(
+                    name="artifacts",
+                    persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                        claim_name=pvc_name
+                    ),
+                )
+            ],
+        ),
+    )
+    
+    try:
+        # Create pod
+        v1.create_namespaced_pod(namespace=args.namespace, body=copy_pod)
+        print(f"Created pod '{pod_name}'...")
+        
+        # Wait for pod to complete
+        pod = wait_for_phase(
+            v1, "pod", pod_name, args.namespace, ("Succeeded", "Failed"), timeout=60
+        )
+        if pod is None:
+            print("✗ Pod did not complete in time", file=sys.stderr)
+            sys.exit(1)
+
+        if pod.status.phase == "Succeeded":
+            # Get pod logs to show the result
+            logs = v1.read_namespaced_pod_log(
+                name=pod_name, namespace=args.namespace
+            )
+            if logs:
+                print(logs)
+            print(f"✓ File downloaded successfully to '{target_path}'")
+        else:
+            # Get pod logs for error
+            try:
+                logs = v1.read_namespaced_pod_log(
+                    name=pod_name, namespace=args.namespace
+                )
+                print(f"✗ Pod failed: {logs}", file=sys.stderr)
+            except:
+                print(f"✗ Pod failed", file=sys.stderr)
+            sys.exit(1)
+    
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        # Clean up pod
+        try:
+            v1.delete_namespaced_pod(name=pod_name, namespace=args.namespace, grace_period_seconds=0)
+        except ApiException:
+            pass
+
+
+def _exec_shell(v1, pod_name, namespace):
+    """Run `sh` in the pod, relaying local stdin and streaming its output.
+
+    Output is read incrementally from the exec websocket rather than buffered
+    until the command exits, so errors show up immediately and Ctrl+C works.
+    """
+    resp = stream(
+        v1.connect_get_namespaced_pod_exec,
+        pod_name,
+        namespace,
+        command=["sh"],
+        stdin=True,
+        stdout=True,
+        stderr=True,
+        tty=False,
+        _preload_content=False,
+    )
+    can_close_stdin = _can_close_stdin(resp)
+    if not can_close_stdin:
+        print("⚠ API server does not support closing exec stdin; end of input ends the session")
+    stdin_open = True
+    try:
+        while resp.is_open():
+            resp.update(timeout=0.1)
+            if resp.peek_stdout():
+                sys.stdout.write(resp.read_stdout())
+                sys.stdout.flush()
+            if resp.peek_stderr():
+                sys.stderr.write(resp.read_stderr())
+                sys.stderr.flush()
+            if stdin_open and select.select([sys.stdin], [], [], 0)[0]:
+                line = sys.stdin.readline()
+                if line:
+                    resp.write_stdin(line)
+                elif can_close_stdin:
+                    resp.close_channel(STDIN_CHANNEL)
+                    stdin_open = False
+                else:
+                    break
+    except KeyboardInterrupt:
+        print()
+    finally:
+        resp.close()
+
+
+def cmd_debug(args):
+    """Create a debug pod with PVC mounted for interactive access."""
+    v1, _ = _get_apis()
+    
+    pvc_name = args.pvc_name or f"artifacts-{args.job_name}"
+    pod_name = args.pod_name or f"debug-{args.job_name}-{int(time.time())}"
+    
+    # Verify PVC exists
+    try:
+        pvc = v1.read_namespaced_persistent_volume_claim(
+            name=pvc_name, namespace=args.namespace
+        )
+        if pvc.status.phase != "Bound":
+            print(f"⚠ PVC '{pvc_name}' exists but is not bound yet", file=sys.stderr)
+    except ApiException as e:
+        if e.status == 404:
+            print(f"✗ PVC '{pvc_name}' not found. Create it first or specify --pvc-name", file=sys.stderr)
+            sys.exit(1)
+        else:
+            print(f"✗ Error checking PVC: {e}", file=sys.stderr)
+            sys.exit(1)
+    
+    # Check if pod already exists
+    try:
+        existing_pod = v1.read_namespaced_pod(name=pod_name, namespace=args.namespace)
+        if existing_pod.status.phase in ["Running", "Pending"]:
+            print(f"Pod '{pod_name}' already exists. Use --pod-name to specify a different name.")
+            print(f"To exec into existing pod: kubectl exec -it {pod_name} -n {args.namespace} -- sh")
+            sys.exit(1)
+    except ApiException:
+        pass  # Pod doesn't exist, continue
+    
+    print(f"Creating debug pod '{pod_name}' with PVC '{pvc_name}' mounted at '/mnt'...")
+    
+    # Create debug pod
+    debug_pod = client.V1Pod(
+        metadata=client.V1ObjectMeta(name=pod_name, namespace=args.namespace),
+        spec=client.V1PodSpec(
+            restart_policy="Never",
+            containers=[
+                client.V1Container(
+                    name="debug",
+                    image=args.image,
+                    image_pull_policy="IfNotPresent",
+                    command=["sh"],
+                    stdin=True,
+                    tty=True,
+                    volume_mounts=[
+                        client.V1VolumeMount(
+                            name="artifacts", mount_path="/mnt"
+                        )
+                    ],
+                )
+            ],
+            volumes=[
+                client.V1Volume(
+                    name="artifacts",
+                    persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                        claim_name=pvc_name
+                    ),
+                )
+            ],
+        ),
+    )
+    
+    try:
+        # Create pod
+        v1.create_namespaced_pod(namespace=args.namespace, body=debug_pod)
+        print(f"✓ Pod '{pod_name}' created")
+        
+        # Wait for pod to be ready
+        print("Waiting for pod to be ready...")
+        if not wait_for_phase(v1, "pod", pod_name, args.namespace, ("Running",), timeout=30):
+            print("⚠ Pod may not be ready yet")
+        
+        print(f"\n✓ Debug pod is ready!")
+        print(f"\nTo access the pod, run:")
+        print(f"  kubectl exec -it {pod_name} -n {args.namespace} -- sh")
+        print(f"\nThe PVC is mounted at /mnt")
+        
+        if args.exec:
+            print(f"\nStarting shell in pod (no TTY; Ctrl+D or Ctrl+C to exit)...")
+            print("For full interactive access, use: kubectl exec -it ...")
+            try:
+                _exec_shell(v1, pod_name, args.namespace)
+            except Exception as e:
+                print(f"Note: Direct exec not available. Use kubectl: {e}")
+        
+        if not args.keep:
+            print(f"\nNote: Pod will remain running. Delete it with:")
+            print(f"  kubectl delete pod {pod_name} -n {args.namespace}")
+            print(f"Or use --keep flag to keep it running")
+    
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        sys.exit(1)
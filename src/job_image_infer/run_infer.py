@@ -2,17 +2,23 @@
 
 import argparse
 import json
+import threading
 import time
 from pathlib import Path
 
-import torch
-import torchvision
-from torchvision import transforms
-from PIL import Image
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# torch, torchvision and PIL are imported inside the functions that use them
+# so argument errors and --help return without loading them.
 
 
 def load_model(model_name):
-    """Load pretrained model."""
+    """Build the pretrained model and load its weights on the CPU."""
+    import torchvision
+
     if model_name == "resnet50":
         model = torchvision.models.resnet50(weights="ResNet50_Weights.DEFAULT")
     elif model_name == "mobilenet_v3_small":
@@ -26,67 +32,166 @@ def load_model(model_name):
     return model
 
 
-def preprocess_image(image_path):
-    """Preprocess image for inference."""
-    transform = transforms.Compose(
-        [
-            transforms.Resize(256),
-            transforms.CenterCrop(224),
-            transforms.ToTensor(),
-            transforms.Normalize(
-                mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]
-            ),
-        ]
-    )
-    
-    image = Image.open(image_path).convert("RGB")
-    image_tensor = transform(image).unsqueeze(0)
-    return image_tensor
+def prepare_model(model, device):
+    """Move the model to device in FP16 with channels_last weights and compile it."""
+    import torch
 
+    # Half precision + NHWC layout lets convolutions run on tensor cores
+    model = model.to(device, memory_format=torch.channels_last).half()
 
-def get_imagenet_labels():
-    """Get ImageNet class labels."""
-    # For demo, return simplified labels
-    # In production, load from imagenet_classes.txt or use torchvision.datasets
-    labels = []
-    # Common ImageNet classes (first 20 as example)
-    common_classes = [
-        "tench", "goldfish", "great white shark", "tiger shark", "hammerhead",
-        "electric ray", "stingray", "cock", "hen", "ostrich",
-        "brambling", "goldfinch", "house finch", "junco", "indigo bunting",
-        "robin", "bulbul", "jay", "magpie", "chickadee"
-    ]
-    # Fill with common classes, then generic class names
-    for i in range(1000):
-        if i < len(common_classes):
-            labels.append(common_classes[i])
+    # Fuse kernels and replay via CUDA graphs; compilation happens on first call
+    try:
+        model = torch.compile(model, mode="reduce-overhead", fullgraph=True)
+    except Exception as e:
+        print(f"torch.compile unavailable ({e}), using eager model")
+    return model
+
+
+# ImageNet normalization, applied on the GPU after the transfer
+_MEAN = (0.485, 0.456, 0.406)
+_STD = (0.229, 0.224, 0.225)
+
+
+_JPEG_MAGIC = b"\xff\xd8"
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _decode_with_pil(image_path):
+    """Decode any Pillow-supported format to a uint8 CHW RGB tensor."""
+    from PIL import Image
+    from torchvision.transforms.functional import pil_to_tensor
+
+    with Image.open(image_path) as image:
+        return pil_to_tensor(image.convert("RGB"))
+
+
+def preprocess_image(image_path, device="cpu"):
+    """Decode, resize and center-crop an image into a uint8 batch on device.
+
+    JPEGs are decoded with nvJPEG directly on the GPU, so the raw image never
+    goes through host memory. PNGs are decoded by torchvision on the CPU and
+    every other format (BMP, GIF, TIFF, WebP, ...) by Pillow, then moved.
+    """
+    from torchvision.io import ImageReadMode, decode_image, decode_jpeg, read_file
+    from torchvision.transforms import functional as F
+
+    with open(image_path, "rb") as f:
+        magic = f.read(len(_PNG_MAGIC))
+
+    if device == "cuda" and magic.startswith(_JPEG_MAGIC):
+        data = read_file(str(image_path))
+        image = decode_jpeg(data, mode=ImageReadMode.RGB, device=device)
+    else:
+        if magic.startswith(_JPEG_MAGIC) or magic == _PNG_MAGIC:
+            image = decode_image(read_file(str(image_path)), mode=ImageReadMode.RGB)
         else:
-            labels.append(f"class_{i}")
-    return labels
+            image = _decode_with_pil(image_path)
+        if device == "cuda":
+            # Pinned memory lets the host-to-device copy run asynchronously
+            image = image.pin_memory().to(device, non_blocking=True)
+
+    image = F.resize(image, 256, antialias=True)
+    image = F.center_crop(image, 224)
+    return image.unsqueeze(0)
+
+
+def normalize_on_device(image_tensor, device):
+    """Scale a uint8 image batch to FP16 on the device and normalize it there."""
+    import torch
+
+    image_tensor = image_tensor.to(device).half().div_(255)
+    mean = torch.tensor(_MEAN, device=device, dtype=torch.float16).view(1, 3, 1, 1)
+    std = torch.tensor(_STD, device=device, dtype=torch.float16).view(1, 3, 1, 1)
+    image_tensor = (image_tensor - mean) / std
+    return image_tensor.contiguous(memory_format=torch.channels_last)
+
+
+# For demo, use simplified labels
+# In production, load from imagenet_classes.txt or use torchvision.datasets
+# Common ImageNet classes (first 20 as example), then generic class names
+_COMMON_CLASSES = (
+    "tench", "goldfish", "great white shark", "tiger shark", "hammerhead",
+    "electric ray", "stingray", "cock", "hen", "ostrich",
+    "brambling", "goldfinch", "house finch", "junco", "indigo bunting",
+    "robin", "bulbul", "jay", "magpie", "chickadee"
+)
+_LABELS = _COMMON_CLASSES + tuple(
+    f"class_{i}" for i in range(len(_COMMON_CLASSES), 1000)
+)
+
+
+def get_imagenet_labels():
+    """Get ImageNet class labels (built once at import)."""
+    return _LABELS
+
+
+def init_cuda_context():
+    """Create the CUDA context by allocating a tensor on the GPU."""
+    import torch
+
+    torch.empty(1, device="cuda")
+
+
+# torch.compile's CUDA graph trees record on the first calls and only replay
+# after that, so warm up several times before timing
+WARMUP_ITERATIONS = 3
+
+
+def warm_up(model, image_tensor, device, iterations=WARMUP_ITERATIONS):
+    """Run the model on the real input until compilation and graph capture are done.
+
+    Returns the model to use: the eager one if the compiled model fails to build.
+    """
+    import torch
+
+    try:
+        with torch.inference_mode():
+            for _ in range(iterations):
+                model(image_tensor)
+    except Exception as e:
+        eager_model = getattr(model, "_orig_mod", None)
+        if eager_model is None:
+            raise
+        print(f"torch.compile failed ({e}), using eager model")
+        model = eager_model
+        with torch.inference_mode():
+            model(image_tensor)
+
+    if device == "cuda":
+        torch.cuda.synchronize()
+    return model
 
 
 def run_inference(model, image_tensor, device):
     """Run inference on image."""
-    model = model.to(device)
-    image_tensor = image_tensor.to(device)
+    import torch
+
+    image_tensor = normalize_on_device(image_tensor, device)
+    model = warm_up(model, image_tensor, device)
     
     start_time = time.time()
-    with torch.no_grad():
+    with torch.inference_mode():
         outputs = model(image_tensor)
-        probabilities = torch.nn.functional.softmax(outputs[0], dim=0)
+        # Softmax in FP32 so small probabilities don't underflow
+        probabilities = torch.nn.functional.softmax(outputs[0].float(), dim=0)
     
+    # CUDA kernels run asynchronously; wait for them so the timing is real
+    if device == "cuda":
+        torch.cuda.synchronize()
     elapsed_ms = (time.time() - start_time) * 1000
     
-    # Get top 5 predictions
+    # Get top 5 predictions, copied to the host in one transfer per tensor
     top5_prob, top5_indices = torch.topk(probabilities, 5)
+    probs = top5_prob.tolist()
+    indices = top5_indices.tolist()
     
     labels = get_imagenet_labels()
     top5 = [
         {
-            "label": labels[idx.item()],
-            "probability": prob.item(),
+            "label": labels[idx],
+            "probability": prob,
         }
-        for prob, idx in zip(top5_prob, top5_indices)
+        for prob, idx in zip(probs, indices)
     ]
     
     return top5, elapsed_ms
@@ -100,18 +205,27 @@ def main():
     parser.add_argument("--output", required=True, help="Output JSON path")
     
     args = parser.parse_args()
-    
+
+    import torch
+
     # Check for GPU
     device = "cuda" if torch.cuda.is_available() else "cpu"
     if device == "cpu":
         raise RuntimeError("CUDA not available! GPU is required for this job.")
     
-    print(f"Using device: {device}")
-    print(f"CUDA device: {torch.cuda.get_device_name(0)}")
+    # Create the CUDA context while the model weights load from disk; nothing
+    # on this thread may touch CUDA until the join
+    cuda_init = threading.Thread(target=init_cuda_context, name="cuda-init")
+    cuda_init.start()
     
     # Load model
     print(f"Loading model: {args.model}")
     model = load_model(args.model)
+    cuda_init.join()
+    
+    print(f"Using device: {device}")
+    print(f"CUDA device: {torch.cuda.get_device_name(0)}")
+    model = prepare_model(model, device)
     
     # Load and preprocess image
     input_path = Path(args.input)
@@ -119,7 +233,7 @@ def main():
         raise FileNotFoundError(f"Input image not found: {args.input}")
     
     print(f"Loading image: {args.input}")
-    image_tensor = preprocess_image(args.input)
+    image_tensor = preprocess_image(args.input, device)
     
     # Run inference
     print("Running inference...")
@@ -137,8 +251,11 @@ def main():
     # Write output
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(output_data, f, indent=2)
+    if orjson is not None:
+        output_path.write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, "w") as f:
+            json.dump(output_data, f, indent=2)
     
     print(f"✓ Inference complete!")
     print(f"  Elapsed: {elapsed_ms:.2f}ms")
@@ -9,6 +9,18 @@ KIND = "EphemeralAccelerationJob"
 # API version string
 API_VERSION = f"{GROUP}/{VERSION}"
 
+# Label carrying the owning job's name on pods created by the operator
+JOB_LABEL = f"{GROUP}/job"
+
+# PVCs handed to the batched TTL cleanup carry this label set to "true",
+# plus the job's finish time and PVC TTL as annotations
+MANAGED_LABEL = f"{GROUP}/managed"
+FINISHED_AT_ANNOTATION = f"{GROUP}/finished-at"
+PVC_TTL_ANNOTATION = f"{GROUP}/pvc-ttl"
+
+# Set on a finished job once nothing is left for the periodic timer to do
+FULLY_CLEANED_ANNOTATION = f"{GROUP}/fully-cleaned"
+
 # Status phases
 PHASE_PENDING = "Pending"
 PHASE_RUNNING = "Running"
@@ -17,3 +29,8 @@ PHASE_FAILED = "Failed"
 
 # Allowed model types
 ALLOWED_MODELS = ["resnet50", "mobilenet_v3_small"]
+
+
+def is_fully_cleaned(meta):
+    """Return True if the job carries the fully-cleaned annotation."""
+    return (meta.get("annotations") or {}).get(FULLY_CLEANED_ANNOTATION) == "true"
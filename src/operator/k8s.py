@@ -1,18 +1,32 @@
 """Kubernetes client helpers."""
 
 import logging
-from kubernetes import client, config
+import threading
+import time
+from kubernetes import client, config, watch
 from kubernetes.client.rest import ApiException
 
+from . import crd
+
 logger = logging.getLogger(__name__)
 
+# Connections kept open per host; the urllib3 default of 4 is exhausted by
+# concurrent kopf handlers and timers
+CONNECTION_POOL_MAXSIZE = 50
+
 # Initialize clients
 _v1 = None
 _custom_api = None
+_init_lock = threading.Lock()
+
+# Job pods keyed by (namespace, name), kept current by the pod informer
+_pod_cache = {}
+_pod_cache_lock = threading.Lock()
+_informer_thread = None
 
 
 def init_clients():
-    """Initialize Kubernetes clients."""
+    """Initialize Kubernetes clients sharing one pooled ApiClient."""
     global _v1, _custom_api
     
     try:
@@ -22,44 +36,103 @@ def init_clients():
         config.load_kube_config()
         logger.info("Loaded kubeconfig")
     
-    _v1 = client.CoreV1Api()
-    _custom_api = client.CustomObjectsApi()
+    cfg = client.Configuration.get_default_copy()
+    cfg.connection_pool_maxsize = CONNECTION_POOL_MAXSIZE
+    api_client = client.ApiClient(configuration=cfg)
+    _v1 = client.CoreV1Api(api_client=api_client)
+    _custom_api = client.CustomObjectsApi(api_client=api_client)
     
     return _v1, _custom_api
 
 
 def get_clients():
-    """Get initialized Kubernetes clients."""
+    """Get initialized Kubernetes clients, creating them on first use."""
     global _v1, _custom_api
     if _v1 is None or _custom_api is None:
-        init_clients()
+        # kopf runs sync handlers in worker threads; load config only once
+        with _init_lock:
+            if _v1 is None or _custom_api is None:
+                init_clients()
     return _v1, _custom_api
 
 
+def _run_pod_informer():
+    """Mirror job pods into _pod_cache with a list followed by a watch.
+
+    Each (re)start relists and replaces the cache so pods deleted while the
+    watch was down do not linger.
+    """
+    v1, _ = get_clients()
+    while True:
+        try:
+            pods = v1.list_pod_for_all_namespaces(label_selector=crd.JOB_LABEL)
+            with _pod_cache_lock:
+                _pod_cache.clear()
+                for pod in pods.items:
+                    _pod_cache[(pod.metadata.namespace, pod.metadata.name)] = pod
+
+            for event in watch.Watch().stream(
+                v1.list_pod_for_all_namespaces,
+                label_selector=crd.JOB_LABEL,
+                resource_version=pods.metadata.resource_version,
+            ):
+                pod = event["object"]
+                key = (pod.metadata.namespace, pod.metadata.name)
+                with _pod_cache_lock:
+                    if event["type"] == "DELETED":
+                        _pod_cache.pop(key, None)
+                    else:
+                        _pod_cache[key] = pod
+        except Exception as e:
+            logger.warning(f"Pod informer watch ended, restarting: {e}")
+            time.sleep(5)
+
+
+def start_pod_informer():
+    """Start the background pod informer thread (idempotent)."""
+    global _informer_thread
+    with _init_lock:
+        if _informer_thread is None:
+            _informer_thread = threading.Thread(
+                target=_run_pod_informer, name="pod-informer", daemon=True
+            )
+            _informer_thread.start()
+            logger.info("Started pod informer")
+
+
+def get_cached_pod(pod_name, namespace):
+    """Return the informer's copy of a pod, or None if it is not cached."""
+    with _pod_cache_lock:
+        return _pod_cache.get((namespace, pod_name))
+
+
 def get_pod_status(v1, pod_name, namespace):
-    """Get pod status."""
-    try:
-        pod = v1.read_namespaced_pod(name=pod_name, namespace=namespace)
-        return {
-            "phase": pod.status.phase,
-            "ready": any(
-                c.type == "Ready" and c.status == "True"
-                for c in (pod.status.conditions or [])
-            ),
-            "container_statuses": [
-                {
-                    "name": cs.name,
-                    "ready": cs.ready,
-                    "state": _get_container_state(cs),
-                }
-                for cs in (pod.status.container_statuses or [])
-            ],
-        }
-    except ApiException as e:
-        if e.status == 404:
-            return None
-        logger.error(f"Error getting pod status: {e}")
-        raise
+    """Get pod status, from the informer cache when possible."""
+    pod = get_cached_pod(pod_name, namespace)
+    if pod is None:
+        try:
+            pod = v1.read_namespaced_pod(name=pod_name, namespace=namespace)
+        except ApiException as e:
+            if e.status == 404:
+                return None
+            logger.error(f"Error getting pod status: {e}")
+            raise
+
+    return {
+        "phase": pod.status.phase,
+        "ready": any(
+            c.type == "Ready" and c.status == "True"
+            for c in (pod.status.conditions or [])
+        ),
+        "container_statuses": [
+            {
+                "name": cs.name,
+                "ready": cs.ready,
+                "state": _get_container_state(cs),
+            }
+            for cs in (pod.status.container_statuses or [])
+        ],
+    }
 
 
 def _get_container_state(container_status):
@@ -73,13 +146,14 @@ def _get_container_state(container_status):
     return "Unknown"
 
 
-def get_pod_logs(v1, pod_name, namespace, tail_lines=50):
-    """Get pod logs."""
+def get_pod_logs(v1, pod_name, namespace, tail_lines=50, limit_bytes=None):
+    """Get pod logs, optionally capped server-side to limit_bytes."""
     try:
         logs = v1.read_namespaced_pod_log(
             name=pod_name,
             namespace=namespace,
             tail_lines=tail_lines,
+            limit_bytes=limit_bytes,
         )
         return logs
     except ApiException as e:
@@ -2,10 +2,9 @@
 
 import logging
 import kopf
-from kubernetes import config
 
-from . import crd
-from .reconcile import reconcile_gpujob
+from . import crd, k8s
+from .reconcile import forget_job, reconcile_gpujob, start_pvc_cleanup
 
 # Configure logging
 logging.basicConfig(
@@ -14,13 +13,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Kubernetes clients
-try:
-    config.load_incluster_config()
-    logger.info("Loaded in-cluster Kubernetes config")
-except:
-    config.load_kube_config()
-    logger.info("Loaded kubeconfig")
+# Kubernetes clients are created lazily by k8s.get_clients() on first reconcile;
+# kopf authenticates its own watches separately.
+
+
+@kopf.on.startup()
+def start_pod_informer(**kwargs):
+    """Start the shared pod cache used for job pod status lookups."""
+    k8s.start_pod_informer()
+
+
+@kopf.on.startup()
+def start_batched_pvc_cleanup(**kwargs):
+    """Start the periodic pass deleting PVCs whose TTL has expired."""
+    start_pvc_cleanup()
 
 
 @kopf.on.create(crd.GROUP, crd.VERSION, crd.PLURAL)
@@ -41,7 +47,12 @@ def gpujob_handler(spec, status, name, namespace, uid, **kwargs):
         raise kopf.TemporaryError(f"Reconciliation failed: {e}", delay=30)
 
 
-@kopf.timer(crd.GROUP, crd.VERSION, crd.PLURAL, interval=30)
+def _needs_timer(meta, **kwargs):
+    """Timer filter: skip finished jobs whose PVC has been handed off."""
+    return not crd.is_fully_cleaned(meta)
+
+
+@kopf.timer(crd.GROUP, crd.VERSION, crd.PLURAL, interval=30, when=_needs_timer)
 def gpujob_timer(spec, status, name, namespace, uid, **kwargs):
     """Periodic reconciliation timer."""
     current_phase = status.get("phase", crd.PHASE_PENDING)
@@ -57,9 +68,10 @@ def gpujob_timer(spec, status, name, namespace, uid, **kwargs):
 
 
 @kopf.on.delete(crd.GROUP, crd.VERSION, crd.PLURAL)
-def gpujob_delete(name, namespace, **kwargs):
+def gpujob_delete(name, namespace, uid, **kwargs):
     """Handle EphemeralAccelerationJob deletion."""
     logger.info(f"EphemeralAccelerationJob {name} deleted, cleaning up resources")
+    forget_job(uid)
     # Kubernetes owner references will handle pod deletion
     # PVC deletion is controlled by owner references (blockOwnerDeletion=False allows manual retention)
 
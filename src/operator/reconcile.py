@@ -1,18 +1,39 @@
 """Core reconciliation logic."""
 
 import logging
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from kubernetes.client.rest import ApiException
 
 from . import crd
-from .k8s import get_clients, get_pod_status, get_pod_logs
-from .templates import create_pvc_manifest, create_pod_manifest
+from .k8s import get_cached_pod, get_clients, get_pod_status, get_pod_logs
+from .templates import JobSpec, create_pvc_manifest, create_pod_manifest, owner_references
 
 logger = logging.getLogger(__name__)
 
+# Seconds between batched PVC cleanup passes, and concurrent deletes per pass
+PVC_CLEANUP_INTERVAL = 60
+PVC_DELETE_WORKERS = 16
 
-def ensure_pvc(v1, pvc_name, namespace, storage_class, size, owner_refs=None):
+_cleanup_thread = None
+_cleanup_lock = threading.Lock()
+
+# UIDs of jobs whose PVC exists with owner references set; nothing left to check
+_pvc_finalized: set[str] = set()
+
+
+def forget_job(uid):
+    """Drop per-job state kept in process memory (job finished or deleted)."""
+    _pvc_finalized.discard(uid)
+
+
+def ensure_pvc(v1, pvc_name, namespace, storage_class, size, owner_refs=None, uid=None):
     """Ensure PVC exists, create if not."""
+    if uid in _pvc_finalized:
+        return True
+
     try:
         pvc = v1.read_namespaced_persistent_volume_claim(
             name=pvc_name, namespace=namespace
@@ -20,28 +41,19 @@ def ensure_pvc(v1, pvc_name, namespace, storage_class, size, owner_refs=None):
         logger.info(f"PVC {pvc_name} already exists")
         
         # Update owner references if not set (for existing PVCs)
-        if owner_refs and (not pvc.metadata.owner_references or len(pvc.metadata.owner_references) == 0):
+        if pvc.metadata.owner_references:
+            if uid:
+                _pvc_finalized.add(uid)
+        elif owner_refs:
             try:
                 # Create patch for owner references
-                patch = {
-                    "metadata": {
-                        "ownerReferences": [
-                            {
-                                "apiVersion": ref.api_version,
-                                "kind": ref.kind,
-                                "name": ref.name,
-                                "uid": ref.uid,
-                                "controller": ref.controller,
-                                "blockOwnerDeletion": ref.block_owner_deletion,
-                            }
-                            for ref in owner_refs
-                        ]
-                    }
-                }
+                patch = {"metadata": {"ownerReferences": owner_refs}}
                 v1.patch_namespaced_persistent_volume_claim(
                     name=pvc_name, namespace=namespace, body=patch
                 )
                 logger.info(f"Updated PVC {pvc_name} with owner references")
+                if uid:
+                    _pvc_finalized.add(uid)
             except Exception as e:
                 logger.warning(f"Could not update PVC owner references: {e}")
         
@@ -55,6 +67,8 @@ def ensure_pvc(v1, pvc_name, namespace, storage_class, size, owner_refs=None):
                     namespace=namespace, body=pvc
                 )
                 logger.info(f"PVC {pvc_name} created")
+                if uid and owner_refs:
+                    _pvc_finalized.add(uid)
                 return True
             except Exception as create_error:
                 logger.error(f"Failed to create PVC: {create_error}")
@@ -64,8 +78,114 @@ def ensure_pvc(v1, pvc_name, namespace, storage_class, size, owner_refs=None):
             raise
 
 
+def mark_pvc_finished(v1, pvc_name, namespace, finished_at, pvc_ttl):
+    """Label and annotate a finished job's PVC for the batched TTL cleanup."""
+    patch = {
+        "metadata": {
+            "labels": {crd.MANAGED_LABEL: "true"},
+            "annotations": {
+                crd.FINISHED_AT_ANNOTATION: finished_at,
+                crd.PVC_TTL_ANNOTATION: str(pvc_ttl),
+            },
+        }
+    }
+    try:
+        v1.patch_namespaced_persistent_volume_claim(
+            name=pvc_name, namespace=namespace, body=patch
+        )
+        logger.info(f"Scheduled PVC {pvc_name} for deletion {pvc_ttl}s after {finished_at}")
+        return True
+    except ApiException as e:
+        if e.status == 404:
+            return True
+        logger.error(f"Error marking PVC as finished: {e}")
+        return False
+
+
+def _to_epoch(timestamp):
+    """Convert an ISO-8601 timestamp to POSIX seconds (naive means UTC).
+
+    Deliberately a copy of cli.commands._to_epoch (the operator and CLI ship
+    separately and share no modules); keep the two in step.
+    """
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _utc_timestamp():
+    """Current UTC time as a status timestamp, e.g. 2024-01-01T12:00:00Z."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def _delete_pvc(v1, pvc):
+    """Delete one PVC, ignoring PVCs that are already gone."""
+    name, namespace = pvc.metadata.name, pvc.metadata.namespace
+    try:
+        v1.delete_namespaced_persistent_volume_claim(name=name, namespace=namespace)
+        logger.info(f"Deleted PVC {namespace}/{name} (PVC TTL expired)")
+    except ApiException as e:
+        if e.status != 404:
+            logger.error(f"Error deleting PVC {namespace}/{name}: {e}")
+
+
+def cleanup_expired_pvcs(v1):
+    """Delete every managed PVC whose TTL has passed, from a single list call."""
+    pvcs = v1.list_persistent_volume_claim_for_all_namespaces(
+        label_selector=f"{crd.MANAGED_LABEL}=true"
+    )
+    now = time.time()
+    
+    expired = []
+    for pvc in pvcs.items:
+        annotations = pvc.metadata.annotations or {}
+        finished_at = annotations.get(crd.FINISHED_AT_ANNOTATION)
+        pvc_ttl = annotations.get(crd.PVC_TTL_ANNOTATION)
+        if not finished_at or pvc_ttl is None:
+            continue  # Job still running
+        try:
+            elapsed = now - _to_epoch(finished_at)
+            if elapsed >= int(pvc_ttl):
+                expired.append(pvc)
+        except ValueError as e:
+            logger.warning(f"Could not check TTL of PVC {pvc.metadata.name}: {e}")
+    
+    if not expired:
+        return
+    
+    with ThreadPoolExecutor(max_workers=min(PVC_DELETE_WORKERS, len(expired))) as pool:
+        list(pool.map(lambda pvc: _delete_pvc(v1, pvc), expired))
+
+
+def _run_pvc_cleanup():
+    """Run cleanup_expired_pvcs every PVC_CLEANUP_INTERVAL seconds."""
+    while True:
+        time.sleep(PVC_CLEANUP_INTERVAL)
+        try:
+            v1, _ = get_clients()
+            cleanup_expired_pvcs(v1)
+        except Exception as e:
+            logger.error(f"PVC cleanup error: {e}", exc_info=True)
+
+
+def start_pvc_cleanup():
+    """Start the background PVC cleanup thread (idempotent)."""
+    global _cleanup_thread
+    with _cleanup_lock:
+        if _cleanup_thread is None:
+            _cleanup_thread = threading.Thread(
+                target=_run_pvc_cleanup, name="pvc-cleanup", daemon=True
+            )
+            _cleanup_thread.start()
+            logger.info("Started batched PVC cleanup")
+
+
 def ensure_pod(v1, pod_name, namespace, job_name, uid, spec, pvc_name, image):
     """Ensure pod exists, create if not."""
+    if get_cached_pod(pod_name, namespace) is not None:
+        return True
+
     try:
         v1.read_namespaced_pod(name=pod_name, namespace=namespace)
         logger.info(f"Pod {pod_name} already exists")
@@ -79,7 +199,7 @@ def ensure_pod(v1, pod_name, namespace, job_name, uid, spec, pvc_name, image):
             output_path = spec.get("output", {}).get("path", "/artifacts/output.json")
             gpu_count = spec.get("resources", {}).get("gpu", 1)
             
-            pod = create_pod_manifest(
+            job = JobSpec(
                 pod_name=pod_name,
                 namespace=namespace,
                 job_name=job_name,
@@ -91,6 +211,7 @@ def ensure_pod(v1, pod_name, namespace, job_name, uid, spec, pvc_name, image):
                 image=image,
                 pvc_name=pvc_name,
             )
+            pod = create_pod_manifest(job)
             
             try:
                 v1.create_namespaced_pod(namespace=namespace, body=pod)
@@ -122,27 +243,18 @@ def reconcile_gpujob(spec, status, name, namespace, uid, **kwargs):
     pvc_size = spec.get("pvcSize", "1Gi")
     image = spec.get("image", "gpu-job-inference:latest")
     
-    # Create owner references for cascade deletion (optional - allows manual PVC retention)
-    from kubernetes.client import V1OwnerReference
-    owner_refs = None
-    if uid:
-        owner_refs = [
-            V1OwnerReference(
-                api_version="gpu.yourdomain.io/v1alpha1",
-                kind="EphemeralAccelerationJob",
-                name=name,
-                uid=uid,
-                controller=True,
-                block_owner_deletion=False,  # Don't block deletion, allow manual PVC retention
-            )
-        ]
-    
     # Phase: Pending -> Running
     if current_phase == crd.PHASE_PENDING:
         logger.info(f"EphemeralAccelerationJob {name} is Pending, setting up resources")
         
+        # Create owner references for cascade deletion (optional - allows manual PVC retention)
+        # Don't block deletion, allow manual PVC retention
+        owner_refs = None
+        if uid:
+            owner_refs = owner_references(name, uid, block_owner_deletion=False)
+        
         # Ensure PVC exists with owner references
-        ensure_pvc(v1, pvc_name, namespace, storage_class, pvc_size, owner_refs)
+        ensure_pvc(v1, pvc_name, namespace, storage_class, pvc_size, owner_refs, uid)
         
         # Create pod
         ensure_pod(v1, pod_name, namespace, name, uid, spec, pvc_name, image)
@@ -150,7 +262,7 @@ def reconcile_gpujob(spec, status, name, namespace, uid, **kwargs):
         # Update status to Running
         return {
             "phase": crd.PHASE_RUNNING,
-            "startedAt": datetime.utcnow().isoformat() + "Z",
+            "startedAt": _utc_timestamp(),
             "podName": pod_name,
             "message": "Pod created and starting",
         }
@@ -175,7 +287,7 @@ def reconcile_gpujob(spec, status, name, namespace, uid, **kwargs):
             
             status_update = {
                 "phase": crd.PHASE_SUCCEEDED,
-                "finishedAt": datetime.utcnow().isoformat() + "Z",
+                "finishedAt": _utc_timestamp(),
                 "artifactPath": output_path,
                 "message": "Job completed successfully",
             }
@@ -198,14 +310,16 @@ def reconcile_gpujob(spec, status, name, namespace, uid, **kwargs):
         
         # Pod failed
         elif pod_phase == "Failed":
-            logs = get_pod_logs(v1, pod_name, namespace, tail_lines=20)
+            # limit_bytes would keep the *first* bytes and cut off the final
+            # exception line, so fetch a few lines and keep the end instead
+            logs = get_pod_logs(v1, pod_name, namespace, tail_lines=10)
             error_message = "Job failed"
             if logs:
                 error_message = f"Job failed. Last logs:\n{logs[-500:]}"  # Last 500 chars
             
             status_update = {
                 "phase": crd.PHASE_FAILED,
-                "finishedAt": datetime.utcnow().isoformat() + "Z",
+                "finishedAt": _utc_timestamp(),
                 "message": error_message,
             }
             
@@ -229,10 +343,18 @@ def reconcile_gpujob(spec, status, name, namespace, uid, **kwargs):
                 "message": f"Pod is {pod_phase}",
             }
     
-    # Phase: Succeeded or Failed - check PVC TTL
+    # Phase: Succeeded or Failed - hand the PVC over to the batched TTL cleanup
     elif current_phase in [crd.PHASE_SUCCEEDED, crd.PHASE_FAILED]:
+        # ensure_pvc is not called again once the job has finished
+        forget_job(uid)
+        
+        if crd.is_fully_cleaned(kwargs.get("meta", {})):
+            return None
+        
         finished_at = status.get("finishedAt")
         pvc_ttl = spec.get("pvcTTLSecondsAfterFinished", 3600)  # Default: 1 hour
+        result = None
+        handed_off = False
         
         # If PVC TTL is 0, delete immediately
         if pvc_ttl == 0:
@@ -241,35 +363,29 @@ def reconcile_gpujob(spec, status, name, namespace, uid, **kwargs):
                     name=pvc_name, namespace=namespace
                 )
                 logger.info(f"Deleted PVC {pvc_name} (PVC TTL=0)")
-                return {"message": "PVC deleted (TTL=0)"}
+                result = {"message": "PVC deleted (TTL=0)"}
+                handed_off = True
             except ApiException as e:
-                if e.status != 404:
+                if e.status == 404:
+                    handed_off = True
+                else:
                     logger.error(f"Error deleting PVC: {e}")
         
-        # Check if PVC TTL has passed
-        elif finished_at and pvc_ttl > 0:
-            try:
-                finished_time = datetime.fromisoformat(finished_at.replace("Z", "+00:00"))
-                if finished_time.tzinfo:
-                    utc_offset = finished_time.utcoffset()
-                    finished_time = (finished_time - utc_offset).replace(tzinfo=None)
-                
-                elapsed = (datetime.utcnow() - finished_time).total_seconds()
-                
-                if elapsed >= pvc_ttl:
-                    try:
-                        v1.delete_namespaced_persistent_volume_claim(
-                            name=pvc_name, namespace=namespace
-                        )
-                        logger.info(f"Deleted PVC {pvc_name} (PVC TTL expired: {elapsed:.0f}s >= {pvc_ttl}s)")
-                        return {"message": f"PVC deleted (TTL expired)"}
-                    except ApiException as e:
-                        if e.status != 404:
-                            logger.error(f"Error deleting PVC: {e}")
-            except Exception as e:
-                logger.warning(f"Could not check PVC TTL: {e}")
+        # Stamp the PVC so cleanup_expired_pvcs deletes it once the TTL passes
+        elif pvc_ttl > 0:
+            if not finished_at:
+                # Status written without finishedAt (older operator or failed
+                # patch); start the TTL now rather than never
+                finished_at = _utc_timestamp()
+                logger.warning(f"EphemeralAccelerationJob {name} has no finishedAt, using {finished_at}")
+                result = {"finishedAt": finished_at}
+            handed_off = mark_pvc_finished(v1, pvc_name, namespace, finished_at, pvc_ttl)
         
-        return None
+        # Stops the 30s timer for this job (see gpujob_timer's when= filter)
+        patch = kwargs.get("patch")
+        if handed_off and patch is not None:
+            patch.metadata.annotations[crd.FULLY_CLEANED_ANNOTATION] = "true"
+        return result
     
     # Unknown phase
     else:
@@ -1,99 +1,188 @@
-"""Kubernetes resource templates."""
+"""Kubernetes resource templates.
 
-from kubernetes import client
-from datetime import datetime
+Manifests are plain dicts in the Kubernetes REST schema, which the client
+sends as-is, so no typed model objects are built for them.
+"""
+
+import copy
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+
+from . import crd
+
+
+@lru_cache(maxsize=1024)
+def _owner_ref(job_name, uid, block_owner_deletion):
+    """Build a job's owner reference once (shared, must not be mutated)."""
+    return (
+        {
+            "apiVersion": crd.API_VERSION,
+            "kind": crd.KIND,
+            "name": job_name,
+            "uid": uid,
+            "controller": True,
+            "blockOwnerDeletion": block_owner_deletion,
+        },
+    )
+
+
+def owner_references(job_name, uid, block_owner_deletion=True):
+    """Return the ownerReferences list pointing at an EphemeralAccelerationJob."""
+    return list(_owner_ref(job_name, uid, block_owner_deletion))
+
+
+@lru_cache(maxsize=64)
+def _pvc_spec(storage_class, size):
+    """Build a PVC spec once per class and size (shared, must not be mutated)."""
+    return {
+        "accessModes": ["ReadWriteOnce"],
+        "storageClassName": storage_class,
+        "resources": {
+            "requests": {"storage": size},
+        },
+    }
 
 
 def create_pvc_manifest(pvc_name, namespace, storage_class="local-path", size="1Gi", owner_refs=None):
     """Create PVC manifest with optional owner references."""
-    metadata = client.V1ObjectMeta(
-        name=pvc_name,
-        namespace=namespace,
-        owner_references=owner_refs if owner_refs else None,
-    )
+    metadata = {
+        "name": pvc_name,
+        "namespace": namespace,
+        "labels": {crd.MANAGED_LABEL: "true"},
+    }
+    if owner_refs:
+        metadata["ownerReferences"] = owner_refs
     
-    return client.V1PersistentVolumeClaim(
-        metadata=metadata,
-        spec=client.V1PersistentVolumeClaimSpec(
-            access_modes=["ReadWriteOnce"],
-            storage_class_name=storage_class,
-            resources=client.V1ResourceRequirements(
-                requests={"storage": size}
-            ),
-        ),
-    )
+    return {
+        "apiVersion": "v1",
+        "kind": "PersistentVolumeClaim",
+        "metadata": metadata,
+        "spec": _pvc_spec(storage_class, size),
+    }
 
 
-def create_pod_manifest(
-    pod_name,
-    namespace,
-    job_name,
-    uid,
-    model,
-    input_path,
-    output_path,
-    gpu_count,
-    image,
-    pvc_name,
-):
-    """Create GPU job pod manifest."""
-    return client.V1Pod(
-        metadata=client.V1ObjectMeta(
-            name=pod_name,
-            namespace=namespace,
-            labels={
-                "app": "gpu-job",
-                "ephemeralaccelerationjob": job_name,
-            },
-            owner_references=[
-                {
-                    "apiVersion": "gpu.yourdomain.io/v1alpha1",
-                    "kind": "EphemeralAccelerationJob",
-                    "name": job_name,
-                    "uid": uid,
-                    "controller": True,
-                    "blockOwnerDeletion": True,
-                }
-            ],
-        ),
-        spec=client.V1PodSpec(
-            restart_policy="Never",
-            containers=[
-                client.V1Container(
-                    name="inference",
-                    image=image,
-                    command=["python", "-m", "job_image_infer.run_infer"],
-                    args=[
-                        "--model",
-                        model,
-                        "--input",
-                        input_path,
-                        "--output",
-                        output_path,
-                    ],
-                    resources=client.V1ResourceRequirements(
-                        requests={
-                            "nvidia.com/gpu": str(gpu_count),
-                        },
-                        limits={
-                            "nvidia.com/gpu": str(gpu_count),
-                        },
-                    ),
-                    volume_mounts=[
-                        client.V1VolumeMount(
-                            name="artifacts",
-                            mount_path="/artifacts",
-                        )
-                    ],
-                )
-            ],
-            volumes=[
-                client.V1Volume(
-                    name="artifacts",
-                    persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
-                        claim_name=pvc_name
-                    ),
-                )
-            ],
-        ),
-    )
+# Pod label keys and the app value, interned once
+_LABEL_APP = sys.intern("app")
+_LABEL_JOB = sys.intern("ephemeralaccelerationjob")
+_APP_VAL = sys.intern("gpu-job")
+
+
+@lru_cache(maxsize=1024)
+def _pod_labels(job_name):
+    """Build a job's pod labels once (shared, must not be mutated)."""
+    return {
+        _LABEL_APP: _APP_VAL,
+        _LABEL_JOB: job_name,
+        crd.JOB_LABEL: job_name,
+    }
+
+
+# GPU quantities for common counts, shared by requests and limits
+_GPU_REQ = {n: {"nvidia.com/gpu": str(n)} for n in (1, 2, 4, 8)}
+
+# Whole container resources blocks for the same counts (shared, must not be mutated)
+_GPU_RR = {n: {"requests": q, "limits": q} for n, q in _GPU_REQ.items()}
+
+# Inference entrypoint and its flag names, shared by every container
+_CMD = ("python", "-m", "job_image_infer.run_infer")
+_MODEL_FLAG = sys.intern("--model")
+_INPUT_FLAG = sys.intern("--input")
+_OUTPUT_FLAG = sys.intern("--output")
+
+# Every job pod mounts its PVC at the same place
+_ARTIFACTS_MOUNT = {"name": "artifacts", "mountPath": "/artifacts"}
+
+
+@lru_cache(maxsize=256)
+def _build_container(image, model, input_path, output_path, gpu_count):
+    """Build the inference container; shared by pods with the same settings.
+
+    The returned dict is shared between calls and must not be mutated.
+    """
+    resources = _GPU_RR.get(gpu_count)
+    if resources is None:
+        gpu = {"nvidia.com/gpu": str(gpu_count)}
+        resources = {"requests": gpu, "limits": gpu}
+    return {
+        "name": "inference",
+        "image": image,
+        "command": _CMD,
+        "args": [
+            _MODEL_FLAG,
+            model,
+            _INPUT_FLAG,
+            input_path,
+            _OUTPUT_FLAG,
+            output_path,
+        ],
+        "resources": resources,
+        "volumeMounts": [_ARTIFACTS_MOUNT],
+    }
+
+
+@lru_cache(maxsize=256)
+def _artifacts_volume(pvc_name):
+    """Build the artifacts volume for a PVC (shared, must not be mutated)."""
+    return {
+        "name": "artifacts",
+        "persistentVolumeClaim": {"claimName": pvc_name},
+    }
+
+
+@dataclass(slots=True, frozen=True)
+class JobSpec:
+    """Per-job inputs to the pod manifest; hashable, so usable as a cache key."""
+
+    pod_name: str
+    namespace: str
+    job_name: str
+    uid: str
+    model: str
+    input_path: str
+    output_path: str
+    gpu_count: int
+    image: str
+    pvc_name: str
+
+
+class PodSpecBuilder:
+    """Builds job pod manifests from templates prepared once.
+
+    The fields shared by every job pod are laid out at construction; build()
+    shallow-copies those templates and fills in only the per-job values.
+    """
+
+    __slots__ = ("_pod", "_spec")
+
+    def __init__(self, restart_policy="Never"):
+        self._pod = {"apiVersion": "v1", "kind": "Pod"}
+        self._spec = {"restartPolicy": restart_policy}
+
+    def build(self, job):
+        """Return the pod manifest for a JobSpec."""
+        spec = copy.copy(self._spec)
+        spec["containers"] = [
+            _build_container(
+                job.image, job.model, job.input_path, job.output_path, job.gpu_count
+            )
+        ]
+        spec["volumes"] = [_artifacts_volume(job.pvc_name)]
+
+        pod = copy.copy(self._pod)
+        pod["metadata"] = {
+            "name": job.pod_name,
+            "namespace": job.namespace,
+            "labels": _pod_labels(job.job_name),
+            "ownerReferences": owner_references(job.job_name, job.uid),
+        }
+        pod["spec"] = spec
+        return pod
+
+
+_POD_BUILDER = PodSpecBuilder()
+
+
+def create_pod_manifest(job):
+    """Create GPU job pod manifest from a JobSpec."""
+    return _POD_BUILDER.build(job)
@@ -0,0 +1,24 @@
+"""Shared test setup.
+
+The operator package is named ``operator``, which the standard library module
+of the same name shadows on import. It is loaded here under another name so
+tests can import its modules as ``egpu_operator.<module>``.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+OPERATOR_DIR = Path(__file__).resolve().parents[1] / "src" / "operator"
+
+
+def _load_operator_package(name="egpu_operator"):
+    spec = importlib.util.spec_from_file_location(
+        name, OPERATOR_DIR / "__init__.py", submodule_search_locations=[str(OPERATOR_DIR)]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[name] = package
+    spec.loader.exec_module(package)
+
+
+_load_operator_package()
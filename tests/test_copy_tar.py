@@ -0,0 +1,41 @@
+"""Tests for the tar archive built by `egpu create --project-dir`."""
+
+import os
+import tarfile
+
+import pytest
+
+from cli import commands
+
+USTAR_MAX_SIZE = 8 * 1024**3 - 1
+
+
+def test_member_over_8gib_gets_valid_header(tmp_path):
+    big = tmp_path / "model.ckpt"
+    big.touch()
+    os.truncate(big, USTAR_MAX_SIZE + 2)  # sparse, takes no disk space
+
+    ti = commands._tarinfo_from_stat(str(big), "project/model.ckpt", big.stat())
+
+    with pytest.raises(ValueError):
+        ti.tobuf(tarfile.USTAR_FORMAT)
+    header = ti.tobuf(commands.TAR_FORMAT)
+    assert header
+
+
+def test_long_paths_round_trip(tmp_path):
+    deep = tmp_path / "project"
+    for i in range(12):
+        deep = deep / f"directory-level-{i:02d}-with-a-long-name"
+    deep.mkdir(parents=True)
+    (deep / "weights.bin").write_bytes(b"data")
+    archive = tmp_path / "upload.tar"
+
+    with tarfile.open(archive, "w", format=commands.TAR_FORMAT) as tar:
+        commands.add_to_tar(tar, tmp_path / "project")
+
+    with tarfile.open(archive) as tar:
+        names = tar.getnames()
+    longest = max(names, key=len)
+    assert len(longest.encode()) > 255
+    assert longest.endswith("weights.bin")
@@ -0,0 +1,57 @@
+"""Tests for the PVC that `egpu create --create-pvc` / `--project-dir` makes."""
+
+from kubernetes.client.rest import ApiException
+
+from cli import commands
+
+
+class FakeCoreV1:
+    def __init__(self, existing=(), read_status=404, create_error=None):
+        self.existing = set(existing)
+        self.read_status = read_status
+        self.create_error = create_error
+        self.created = []
+
+    def read_namespaced_persistent_volume_claim(self, name, namespace):
+        if name in self.existing:
+            return object()
+        raise ApiException(status=self.read_status)
+
+    def create_namespaced_persistent_volume_claim(self, namespace, body):
+        if self.create_error:
+            raise self.create_error
+        self.created.append((namespace, body))
+        return body
+
+
+def test_creates_missing_pvc():
+    v1 = FakeCoreV1()
+
+    assert commands.create_pvc(v1, "artifacts-job", "ml", storage_class="fast", size="5Gi")
+
+    [(namespace, pvc)] = v1.created
+    assert namespace == "ml"
+    assert pvc.metadata.name == "artifacts-job"
+    assert pvc.spec.storage_class_name == "fast"
+    assert pvc.spec.access_modes == ["ReadWriteOnce"]
+    assert pvc.spec.resources.requests == {"storage": "5Gi"}
+
+
+def test_existing_pvc_is_left_alone():
+    v1 = FakeCoreV1(existing={"artifacts-job"})
+
+    assert commands.create_pvc(v1, "artifacts-job", "ml")
+    assert v1.created == []
+
+
+def test_read_error_other_than_404_fails():
+    v1 = FakeCoreV1(read_status=403)
+
+    assert not commands.create_pvc(v1, "artifacts-job", "ml")
+    assert v1.created == []
+
+
+def test_create_error_fails():
+    v1 = FakeCoreV1(create_error=ApiException(status=409))
+
+    assert not commands.create_pvc(v1, "artifacts-job", "ml")
@@ -0,0 +1,103 @@
+"""Tests for `egpu delete-batch`."""
+
+import time
+from argparse import Namespace
+
+import pytest
+from kubernetes.client.rest import ApiException
+
+from cli import commands
+
+
+def _job(name, finished_ago=None, ttl=0):
+    job = {"metadata": {"name": name}, "spec": {"ttlSecondsAfterFinished": ttl}, "status": {}}
+    if finished_ago is not None:
+        job["status"]["finishedAt"] = time.strftime(
+            "%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - finished_ago)
+        )
+    return job
+
+
+class FakeCustomObjects:
+    def __init__(self, jobs, delete_status=None):
+        self.jobs = jobs
+        self.delete_status = delete_status
+        self.list_kwargs = []
+        self.deleted = []
+
+    def list_namespaced_custom_object(self, **kwargs):
+        self.list_kwargs.append(kwargs)
+        return {"items": self.jobs, "metadata": {}}
+
+    def delete_namespaced_custom_object(self, name, namespace, **kwargs):
+        if self.delete_status:
+            raise ApiException(status=self.delete_status)
+        self.deleted.append((namespace, name))
+
+
+class FakeCoreV1:
+    def __init__(self):
+        self.deleted_pvcs = []
+
+    def delete_namespaced_persistent_volume_claim(self, name, namespace):
+        self.deleted_pvcs.append((namespace, name))
+
+
+@pytest.fixture
+def delete_batch(monkeypatch):
+    def run(custom_api, v1, *names, delete_pvc=False):
+        monkeypatch.setattr(commands, "_get_apis", lambda: (v1, custom_api))
+        commands.cmd_delete_batch(Namespace(names=list(names), namespace="ml", delete_pvc=delete_pvc))
+
+    return run
+
+
+def test_deletes_jobs_from_one_consistent_list(delete_batch):
+    custom_api = FakeCustomObjects([_job("a"), _job("b"), _job("c")])
+    v1 = FakeCoreV1()
+
+    delete_batch(custom_api, v1, "a", "b")
+
+    assert sorted(custom_api.deleted) == [("ml", "a"), ("ml", "b")]
+    [list_kwargs] = custom_api.list_kwargs
+    assert "resource_version" not in list_kwargs
+    assert v1.deleted_pvcs == []
+
+
+def test_missing_job_fails_but_others_are_deleted(delete_batch):
+    custom_api = FakeCustomObjects([_job("a")])
+
+    with pytest.raises(SystemExit):
+        delete_batch(custom_api, FakeCoreV1(), "a", "missing")
+
+    assert custom_api.deleted == [("ml", "a")]
+
+
+def test_delete_error_fails(delete_batch):
+    custom_api = FakeCustomObjects([_job("a")], delete_status=403)
+
+    with pytest.raises(SystemExit):
+        delete_batch(custom_api, FakeCoreV1(), "a")
+
+
+def test_pvc_deleted_only_where_ttl_passed(delete_batch):
+    custom_api = FakeCustomObjects([
+        _job("expired", finished_ago=120, ttl=60),
+        _job("recent", finished_ago=10, ttl=3600),
+        _job("running", ttl=60),
+    ])
+    v1 = FakeCoreV1()
+
+    delete_batch(custom_api, v1, "expired", "recent", "running")
+
+    assert len(custom_api.deleted) == 3
+    assert v1.deleted_pvcs == [("ml", "artifacts-expired")]
+
+
+def test_delete_pvc_flag_deletes_every_default_named_pvc(delete_batch):
+    custom_api = FakeCustomObjects([_job("a", finished_ago=10, ttl=3600), _job("b")])
+    v1 = FakeCoreV1()
+
+    delete_batch(custom_api, v1, "a", "b", delete_pvc=True)
+
+    assert sorted(v1.deleted_pvcs) == [("ml", "artifacts-a"), ("ml", "artifacts-b")]
@@ -0,0 +1,158 @@
+"""Tests for the operator's batched TTL cleanup of finished jobs' PVCs."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from kubernetes.client.rest import ApiException
+
+from egpu_operator import crd, reconcile
+
+NOW = time.time()
+
+
+def _iso(epoch):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+
+
+def _pvc(name, finished_at=None, pvc_ttl=None, namespace="ml"):
+    annotations = {}
+    if finished_at is not None:
+        annotations[crd.FINISHED_AT_ANNOTATION] = finished_at
+    if pvc_ttl is not None:
+        annotations[crd.PVC_TTL_ANNOTATION] = pvc_ttl
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, namespace=namespace, annotations=annotations or None)
+    )
+
+
+class FakeCoreV1:
+    def __init__(self, pvcs=(), delete_status=None, patch_status=None):
+        self.pvcs = list(pvcs)
+        self.delete_status = delete_status
+        self.patch_status = patch_status
+        self.selectors = []
+        self.deleted = []
+        self.patched = []
+
+    def list_persistent_volume_claim_for_all_namespaces(self, label_selector):
+        self.selectors.append(label_selector)
+        return SimpleNamespace(items=self.pvcs)
+
+    def delete_namespaced_persistent_volume_claim(self, name, namespace):
+        if self.delete_status:
+            raise ApiException(status=self.delete_status)
+        self.deleted.append((namespace, name))
+
+    def patch_namespaced_persistent_volume_claim(self, name, namespace, body):
+        if self.patch_status:
+            raise ApiException(status=self.patch_status)
+        self.patched.append((namespace, name, body))
+
+
+def test_lists_only_managed_pvcs():
+    v1 = FakeCoreV1()
+
+    reconcile.cleanup_expired_pvcs(v1)
+
+    assert v1.selectors == [f"{crd.MANAGED_LABEL}=true"]
+
+
+def test_deletes_expired_pvcs():
+    v1 = FakeCoreV1([
+        _pvc("artifacts-a", _iso(NOW - 120), "60"),
+        _pvc("artifacts-b", _iso(NOW - 10), "0", namespace="other"),
+    ])
+
+    reconcile.cleanup_expired_pvcs(v1)
+
+    assert sorted(v1.deleted) == [("ml", "artifacts-a"), ("other", "artifacts-b")]
+
+
+def test_keeps_pvcs_whose_ttl_has_not_passed():
+    v1 = FakeCoreV1([_pvc("artifacts-a", _iso(NOW - 10), "3600")])
+
+    reconcile.cleanup_expired_pvcs(v1)
+
+    assert v1.deleted == []
+
+
+@pytest.mark.parametrize("finished_at, pvc_ttl", [(None, "60"), (_iso(NOW - 120), None), (None, None)])
+def test_keeps_pvcs_missing_an_annotation(finished_at, pvc_ttl):
+    v1 = FakeCoreV1([_pvc("artifacts-a", finished_at, pvc_ttl)])
+
+    reconcile.cleanup_expired_pvcs(v1)
+
+    assert v1.deleted == []
+
+
+@pytest.mark.parametrize("finished_at, pvc_ttl", [(_iso(NOW - 120), "1h"), ("yesterday", "60")])
+def test_bad_annotation_values_skip_only_that_pvc(finished_at, pvc_ttl):
+    v1 = FakeCoreV1([
+        _pvc("artifacts-bad", finished_at, pvc_ttl),
+        _pvc("artifacts-good", _iso(NOW - 120), "60"),
+    ])
+
+    reconcile.cleanup_expired_pvcs(v1)
+
+    assert v1.deleted == [("ml", "artifacts-good")]
+
+
+def test_already_deleted_pvc_is_not_an_error(caplog):
+    v1 = FakeCoreV1([_pvc("artifacts-a", _iso(NOW - 120), "60")], delete_status=404)
+
+    reconcile.cleanup_expired_pvcs(v1)
+
+    assert not [r for r in caplog.records if r.levelname == "ERROR"]
+
+
+def test_other_delete_errors_are_logged(caplog):
+    v1 = FakeCoreV1([_pvc("artifacts-a", _iso(NOW - 120), "60")], delete_status=403)
+
+    reconcile.cleanup_expired_pvcs(v1)
+
+    assert any("artifacts-a" in r.getMessage() for r in caplog.records if r.levelname == "ERROR")
+
+
+def test_mark_pvc_finished_labels_and_annotates():
+    v1 = FakeCoreV1()
+
+    assert reconcile.mark_pvc_finished(v1, "artifacts-a", "ml", "2024-01-01T12:00:00Z", 300)
+
+    [(namespace, name, body)] = v1.patched
+    assert (namespace, name) == ("ml", "artifacts-a")
+    assert body["metadata"]["labels"] == {crd.MANAGED_LABEL: "true"}
+    assert body["metadata"]["annotations"] == {
+        crd.FINISHED_AT_ANNOTATION: "2024-01-01T12:00:00Z",
+        crd.PVC_TTL_ANNOTATION: "300",
+    }
+
+
+def test_mark_pvc_finished_missing_pvc_counts_as_done():
+    assert reconcile.mark_pvc_finished(FakeCoreV1(patch_status=404), "artifacts-a", "ml", "x", 60)
+
+
+def test_mark_pvc_finished_reports_other_errors():
+    assert not reconcile.mark_pvc_finished(FakeCoreV1(patch_status=500), "artifacts-a", "ml", "x", 60)
+
+
+def test_cleanup_loop_survives_a_failed_pass(monkeypatch):
+    passes = []
+
+    def cleanup(v1):
+        passes.append(v1)
+        if len(passes) == 1:
+            raise ApiException(status=500)
+
+    def sleep(seconds):
+        if len(passes) == 3:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(reconcile, "cleanup_expired_pvcs", cleanup)
+    monkeypatch.setattr(reconcile, "get_clients", lambda: ("v1", "custom"))
+    monkeypatch.setattr(reconcile.time, "sleep", sleep)
+
+    with pytest.raises(KeyboardInterrupt):
+        reconcile._run_pvc_cleanup()
+
+    assert passes == ["v1", "v1", "v1"]
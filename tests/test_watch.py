@@ -0,0 +1,88 @@
+"""Tests for which errors `egpu watch` retries and which make it exit."""
+
+from argparse import Namespace
+
+import pytest
+from kubernetes.client.rest import ApiException
+
+from cli import commands
+
+
+def _job(phase):
+    return {"metadata": {"resourceVersion": "1"}, "status": {"phase": phase}}
+
+
+class FakeCustomObjects:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def get_namespaced_custom_object(self, **kwargs):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def list_namespaced_custom_object(self, **kwargs):
+        raise AssertionError("only called through the watch")
+
+
+class FakeWatch:
+    events = []
+
+    def stream(self, func, **kwargs):
+        for event in self.events.pop(0):
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def watch_job(monkeypatch):
+    monkeypatch.setattr(commands.time, "sleep", lambda _: None)
+    monkeypatch.setattr(commands.watch, "Watch", FakeWatch)
+
+    def run(custom_api, *streams):
+        FakeWatch.events = list(streams)
+        monkeypatch.setattr(commands, "_get_apis", lambda: (None, custom_api))
+        commands.cmd_watch(Namespace(name="job", namespace="ml"))
+
+    return run
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_auth_errors_reading_job_exit(watch_job, status):
+    with pytest.raises(SystemExit):
+        watch_job(FakeCustomObjects(ApiException(status=status)))
+
+
+def test_auth_error_during_watch_exits(watch_job):
+    custom_api = FakeCustomObjects(_job("Running"))
+
+    with pytest.raises(SystemExit):
+        watch_job(custom_api, [ApiException(status=403)])
+
+
+@pytest.mark.parametrize("status", [410, 429, 500, 503])
+def test_transient_errors_are_retried(watch_job, status):
+    custom_api = FakeCustomObjects(
+        ApiException(status=status), _job("Running"), _job("Succeeded")
+    )
+
+    watch_job(custom_api, [ApiException(status=status)])
+
+    assert custom_api.responses == []
+
+
+def test_connection_errors_are_retried(watch_job):
+    custom_api = FakeCustomObjects(_job("Running"), _job("Running"))
+
+    watch_job(
+        custom_api,
+        [commands.ProtocolError("connection reset")],
+        [{"type": "MODIFIED", "object": _job("Succeeded")}],
+    )
+
+    assert custom_api.responses == []